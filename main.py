@@ -10,18 +10,34 @@
 # ===============================
 
 # --- Standard library imports ---
+import asyncio
 import os
 import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Optional third-party imports ---
+# orjson is a faster JSON parser; fall back to the standard library if it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Local module imports ---
-from utils import start
+from scraping import connect_client, new_telegram_limiter, new_translation_limiter, load_translation_cache, save_translation_cache
+from utils import start, resolve_session_path
+
+# Progress is logged at INFO level; set DEBUG to log every extracted message
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logging.getLogger('telethon').setLevel(logging.WARNING)
 
 # Use the project root directory (current working directory where main.py runs)
 cwd = os.getcwd()
 
-# Get API credentials from config.json
-with open('config.json', 'r', encoding='utf-8') as f:
-    config = json.load(f)
+# Get API credentials from config.json (read once as bytes; both parsers accept UTF-8 bytes)
+with open('config.json', 'rb') as f:
+    raw_config = f.read()
+config = orjson.loads(raw_config) if orjson is not None else json.loads(raw_config)
 
 api_id = config['api_id']
 api_hash = config['api_hash']
@@ -35,9 +51,41 @@ print('Start Telegram Scraper...')
 start_date = input('Enter start date (YYYY-MM-DD or leave empty for today): ').strip()
 end_date = input('Enter end date (YYYY-MM-DD or leave empty for now): ').strip()
 
-# Iterate through chats and start scraping
-for chat in chats:
-    chat_name = chat['chat_name']
-    chat_id = chat['chat_id']
-    # Pass start_date and end_date directly; utils.start will normalize defaults
-    start(start_date, end_date, chat_id, chat_name, api_id, api_hash, phone_number, translation_option, export_option, cwd)
+
+async def main():
+    # Blocking work (translation HTTP calls, media file writes) runs via asyncio.to_thread;
+    # one shared, bounded pool keeps it off the event loop without spawning a thread per task
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=8, thread_name_prefix='scraper'))
+
+    # Translations of earlier runs are reused; the cache is saved again when the run ends
+    translation_cache_path = os.path.join(cwd, 'data', '_translation_cache.json')
+    load_translation_cache(translation_cache_path)
+
+    # One client (one connection, one authorization, one session file kept between runs) is shared by all chats
+    session_path = resolve_session_path(cwd, [chat['chat_name'] for chat in chats])
+    client = await connect_client(session_path, api_id, api_hash, phone_number)
+
+    # All chats share the Telegram request budget of the account and the rate limit of the translation service
+    tg_limiter = new_telegram_limiter()
+    translate_limiter = new_translation_limiter()
+
+    try:
+        # Scrape all chats concurrently; pass start_date and end_date directly, utils.start will normalize defaults
+        results = await asyncio.gather(
+            *(start(client, start_date, end_date, chat['chat_id'], chat['chat_name'], translation_option, export_option, cwd, tg_limiter,
+                    translate_limiter)
+              for chat in chats),
+            return_exceptions=True
+        )
+        # A failing chat does not abort the others; report it once all chats are done
+        for chat, result in zip(chats, results):
+            if isinstance(result, Exception):
+                print(f">>> SCRAPING FAILED FOR CHAT: {chat['chat_name']} ({result!r}) <<<")
+    finally:
+        # Disconnecting flushes the session (auth key, update state, peer cache) for the next run
+        await client.disconnect()
+        save_translation_cache(translation_cache_path)
+
+
+asyncio.run(main())
+
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Telegram Scraper Rate Limiting
+# ======================================
+# This module provides an adaptive token-bucket rate limiter used to keep
+# Telegram API and translation requests below the server-side flood limits.
+#
+# Author: Sergej Lembke
+# License: See LICENSE file
+# ======================================
+
+# --- Standard library imports ---
+import asyncio
+import time
+
+
+class AdaptiveRateLimiter:
+    """
+    Token-bucket rate limiter whose rate adapts to observed flood waits (AIMD).
+
+    Every call has to take one token from the bucket before it starts. The bucket is refilled
+    with `rate` tokens per `time_period`. Whenever the server answers with a flood wait, the
+    limiter pauses all callers for the requested number of seconds and shrinks the rate
+    multiplicatively. Every successful call increases the rate additively again, up to `max_rate`.
+    The additive step is damped by an exponentially weighted moving average (EWMA) of the observed
+    flood waits, so the limiter recovers more slowly on accounts that are throttled hard.
+
+    Usage:
+        limiter = AdaptiveRateLimiter(max_rate=20, time_period=1)
+        async with limiter:
+            await client.get_entity(...)
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 1.0, min_rate: float = 1.0,
+                 decrease_factor: float = 0.5, increase_step: float = 0.1, ewma_alpha: float = 0.3) -> None:
+        """
+        Args:
+            max_rate: Maximum number of calls per `time_period`; also the initial rate and bucket size.
+            time_period: Length of the rate window in seconds.
+            min_rate: Lower bound for the rate when shrinking after flood waits.
+            decrease_factor: Factor the rate is multiplied with after each flood wait.
+            increase_step: Amount the rate grows by after each successful call.
+            ewma_alpha: Weight of the newest flood wait in the moving average.
+        """
+        self.max_rate = float(max_rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.time_period = float(time_period)
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.ewma_alpha = ewma_alpha
+        self.rate = self.max_rate
+        self.flood_wait_ewma = 0.0
+        self._tokens = self.max_rate
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.rate, self._tokens + (now - self._last_refill) * self.rate / self.time_period)
+        self._last_refill = now
+
+    async def acquire(self) -> None:
+        """
+        Waits until a token is available (and any flood-wait pause is over) and takes it.
+
+        Returns:
+            None
+        """
+        # Waiters are served one at a time, in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.time_period / self.rate)
+
+    def on_success(self) -> None:
+        """
+        Additive increase: grows the rate after a call went through without a flood wait.
+
+        Returns:
+            None
+        """
+        self.rate = min(self.max_rate, self.rate + self.increase_step / (1 + self.flood_wait_ewma))
+
+    def on_flood_wait(self, seconds: float) -> None:
+        """
+        Multiplicative decrease: pauses all callers for `seconds` and shrinks the rate.
+
+        Args:
+            seconds: Number of seconds the server asked to wait.
+
+        Returns:
+            None
+        """
+        self.flood_wait_ewma = self.ewma_alpha * seconds + (1 - self.ewma_alpha) * self.flood_wait_ewma
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def __aenter__(self) -> 'AdaptiveRateLimiter':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return False
@@ -11,183 +11,705 @@
 
 # --- Standard library imports ---
 import asyncio
-from datetime import datetime, timezone
-from typing import Union, Any
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union, Any, Iterable
 
 # --- Third-party imports ---
 from telethon import TelegramClient
+from telethon.errors import FloodWaitError
 from telethon.tl.types import PeerUser
 # NOTE: Import translator lazily inside the function to avoid hard dependency
 # from deep_translator import GoogleTranslator
 
+# --- Local module imports ---
+from ratelimit import AdaptiveRateLimiter
+
 # If running in Spyder or environments with nested event loops, uncomment below:
 # import nest_asyncio
 # nest_asyncio.apply()
 
+log = logging.getLogger(__name__)
+
+# Number of messages requested per history call (Telegram serves at most 100 per request)
+_PAGE_SIZE = 100
+
+# Number of extracted messages between two progress log lines
+_PROGRESS_INTERVAL = 1000
+
+# Maximum number of messages processed concurrently (sender lookup, media download)
+_CONCURRENCY = 16
+
+# Initial (and maximum) request rates per second for the Telegram API and the translator
+_TELEGRAM_RATE = 20
+_TRANSLATE_RATE = 5
+
+# Number of attempts for a translation that is rejected with HTTP 429, and the pause in between
+_TRANSLATE_RETRIES = 3
+_TRANSLATE_BACKOFF_SECONDS = 5
+
+# Date formats accepted in addition to ISO 8601 (e.g. '31.12.2025 18:30'), keyed by the length of their
+# zero-padded form, so those take a single strptime call; other spellings (e.g. '1.1.2025') try each format
+_DOTTED_DATE_FORMATS = {10: "%d.%m.%Y", 16: "%d.%m.%Y %H:%M", 19: "%d.%m.%Y %H:%M:%S"}
+
+# Fallback for dash separated dates that ISO 8601 rejects because they are not zero-padded (e.g. '2025-1-5 9:30')
+_DASHED_DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S")
+
+# MIME type of the videos that are downloaded
+_MP4 = 'video/mp4'
+
+# Offset that turns Telegram's exclusive offset_date into an inclusive bound
+_ONE_SECOND = timedelta(seconds=1)
+
+# Write buffer of the spool file; a page of rows is flushed in one or a few syscalls
+_SPOOL_BUFFER_BYTES = 1 << 20
 
-def scraping(start_date: Union[str, datetime, None], end_date: Union[str, datetime, None], chat_id: Union[str, int], chat_name: str, api_id: int, api_hash: str, phone_number: str, translation_option: dict[str, Any], cwd_new: str) -> tuple[list[list[Any]], bool]:
+# Maximum number of translations kept in the in-memory translation cache
+_TRANSLATION_CACHE_SIZE = 10_000
+
+# Videos are requested in parts of this size (the maximum Telegram serves per request). Videos of at least
+# _PARALLEL_DOWNLOAD_MIN_BYTES are split into _DOWNLOAD_RANGES byte ranges that are downloaded concurrently.
+_DOWNLOAD_PART_BYTES = 512 * 1024
+_DOWNLOAD_RANGES = 4
+_PARALLEL_DOWNLOAD_MIN_BYTES = 4 * _DOWNLOAD_PART_BYTES
+
+# Download buffers larger than this (e.g. after a very large photo) are released instead of being kept in the pool
+_MAX_POOLED_BUFFER_BYTES = 8 * 1024 * 1024
+
+
+async def _retry_on_flood(limiter: AdaptiveRateLimiter, chat_name: str, func, *args, **kwargs):
     """
-    Extracts and processes messages from a Telegram group or channel for a specified time frame.
+    Awaits a Telegram API call through the rate limiter and retries it whenever Telegram answers
+    with a FLOOD_WAIT. The requested wait is honored as a hard pause of the limiter.
+
+    Args:
+        limiter: Rate limiter shared by all Telegram calls of the client.
+        chat_name: Name of the chat the call is made for, shown in the FLOOD_WAIT message.
+        func: Coroutine function to call, e.g. `client.get_entity`.
+        *args: Positional arguments passed to `func`.
+        **kwargs: Keyword arguments passed to `func`.
+
+    Returns:
+        Any: The result of the awaited call.
+    """
+    while True:
+        async with limiter:
+            try:
+                result = await func(*args, **kwargs)
+            except FloodWaitError as e:
+                print(f'{chat_name}: FLOOD WAIT: pausing requests for {e.seconds} seconds')
+                limiter.on_flood_wait(e.seconds)
+                continue
+        limiter.on_success()
+        return result
 
-    This function connects to a specified Telegram group or channel using provided credentials
-    and settings. It extracts messages from the group/channel within a user-specified
-    time frame between start_date and end_date. Messages can include text, sender information,
-    media (photos or videos), and translation to English if enabled. The extracted data is saved
-    along with metadata for further processing or analysis.
+
+class _LRUCache:
+    """
+    Small least-recently-used cache on top of an OrderedDict.
+
+    Once `maxsize` entries are stored, adding a new entry evicts the entry that was used least recently.
+    Only used from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Any) -> Any:
+        """
+        Returns the cached value for `key` (marking it as recently used), or None if it is not cached.
+        """
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Any, value: Any) -> None:
+        """
+        Stores `value` under `key`, evicting the least recently used entry if the cache is full.
+        """
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def items(self) -> list[tuple[Any, Any]]:
+        """
+        Returns all entries, from least to most recently used.
+        """
+        return list(self._data.items())
+
+
+# Sender lookups (sender_id -> get_entity future) per client, shared by all chats scraped with that client
+_sender_caches: 'weakref.WeakKeyDictionary[TelegramClient, dict[int, asyncio.Future]]' = weakref.WeakKeyDictionary()
+
+# Translations keyed by `_translation_key`, shared by all chats of a run and persisted between runs
+_translation_cache = _LRUCache(_TRANSLATION_CACHE_SIZE)
+
+
+def _translation_key(source_language: str, target_language: str, text: str) -> tuple[str, str, bytes]:
+    """
+    Builds the translation cache key. The text is stored as a 16-byte BLAKE2b digest, so long
+    messages do not keep a second copy of their text alive in the cache.
+    """
+    return source_language, target_language, hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def load_translation_cache(path: str) -> None:
+    """
+    Loads translations persisted by `save_translation_cache` into the in-memory translation cache.
+
+    A missing or unreadable cache file is ignored, so the first run (or a corrupted file) simply
+    starts with an empty cache.
 
     Args:
-        start_date: Inclusive start date-time for extraction. If None or empty, defaults to today at 00:00.
-        end_date: Inclusive end date-time for extraction. If None or empty, defaults to now.
-        chat_id: Unique identifier or username of the chat/group/channel to extract messages from.
-        chat_name: Name of the chat used to create a session for storing extracted data.
+        path: Path of the JSON cache file.
+
+    Returns:
+        None
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        for source_language, target_language, digest, translated_text in entries:
+            _translation_cache.put((source_language, target_language, bytes.fromhex(digest)), translated_text)
+    except (OSError, ValueError, TypeError):
+        pass
+
+
+def save_translation_cache(path: str) -> None:
+    """
+    Persists the in-memory translation cache so the next run can reuse its translations.
+
+    Args:
+        path: Path of the JSON cache file.
+
+    Returns:
+        None
+    """
+    entries = [
+        [source_language, target_language, digest.hex(), translated_text]
+        for (source_language, target_language, digest), translated_text in _translation_cache.items()
+    ]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, ensure_ascii=False)
+
+
+def _forget_failed_lookup(sender_cache: dict, sender_id: int, lookup: asyncio.Future) -> None:
+    """
+    Done callback of a cached sender lookup: removes it from the cache if it failed or was cancelled,
+    so the next message of that sender tries again instead of failing with the same error.
+
+    Args:
+        sender_cache: The sender cache of the client.
+        sender_id: The ID the lookup was made for.
+        lookup: The finished lookup.
+
+    Returns:
+        None
+    """
+    if (lookup.cancelled() or lookup.exception() is not None) and sender_cache.get(sender_id) is lookup:
+        del sender_cache[sender_id]
+
+
+class _PooledBuffer(io.RawIOBase):
+    """
+    Reusable in-memory write target for `download_media`.
+
+    The underlying bytearray keeps its capacity between downloads, so buffers handed out from
+    the download pool are allocated once and then overwritten instead of being reallocated for
+    every photo. Buffers that grew beyond `_MAX_POOLED_BUFFER_BYTES` are released on reset.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buffer = bytearray()
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        n = len(b)
+        # Overwrites in place while capacity suffices, extends the bytearray otherwise
+        self._buffer[self._size:self._size + n] = b
+        self._size += n
+        return n
+
+    def getbuffer(self) -> memoryview:
+        """
+        Returns a view of the bytes written since the last reset. Release it before the next write.
+        """
+        return memoryview(self._buffer)[:self._size]
+
+    def reset(self) -> None:
+        """
+        Empties the buffer for reuse, keeping its capacity unless it exceeds the pool limit.
+        """
+        self._size = 0
+        if len(self._buffer) > _MAX_POOLED_BUFFER_BYTES:
+            self._buffer = bytearray()
+
+
+def _write_file(path: str, payload: Union[bytes, memoryview]) -> None:
+    """
+    Writes binary content to a file, replacing any existing file.
+
+    Args:
+        path: Path of the file to write.
+        payload: Bytes (or a view on bytes) to write.
+
+    Returns:
+        None
+    """
+    with open(path, 'wb') as f:
+        f.write(payload)
+
+
+def _strptime_any(value: str, formats: Iterable[str]) -> datetime:
+    """
+    Parses a date string with the first of the given formats that matches.
+
+    Args:
+        value: Date string.
+        formats: strptime formats to try in order.
+
+    Returns:
+        datetime: The parsed (naive) datetime.
+
+    Raises:
+        ValueError: If none of the formats matches.
+    """
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise ValueError(value)
+
+
+def to_utc_datetime(val: Union[str, datetime, None], default: datetime) -> datetime:
+    """
+    Normalizes a user supplied date to a timezone-aware UTC datetime.
+
+    Used by `utils.start` to resolve the time frame of an extraction once, before it is passed to `scraping`.
+
+    Args:
+        val: Date as string (ISO 8601, `_DASHED_DATE_FORMATS` or `_DOTTED_DATE_FORMATS`), datetime, or None.
+        default: Value returned for None or an empty string.
+
+    Returns:
+        datetime: The normalized UTC datetime.
+
+    Raises:
+        ValueError: If the string has an unrecognized format or `val` has an unsupported type.
+    """
+    if val is None:
+        return default
+    if isinstance(val, str):
+        v = val.strip()
+        if v == "":
+            return default
+        try:
+            if '.' in v[:3]:
+                # Dotted European format ('DD.MM.YYYY...'), recognized by its separator, so it does not go
+                # through a failing ISO parse first. The zero-padded form is picked by its length.
+                dt = None
+                if v[2:3] == '.' and len(v) in _DOTTED_DATE_FORMATS:
+                    try:
+                        dt = datetime.strptime(v, _DOTTED_DATE_FORMATS[len(v)])
+                    except ValueError:
+                        pass
+                if dt is None:
+                    dt = _strptime_any(v, _DOTTED_DATE_FORMATS.values())
+            else:
+                # ISO 8601 covers 'YYYY-MM-DD', 'YYYY-MM-DD HH:MM' and 'YYYY-MM-DD HH:MM:SS' in one C-level call
+                try:
+                    dt = datetime.fromisoformat(v)
+                except ValueError:
+                    dt = _strptime_any(v, _DASHED_DATE_FORMATS)
+        except ValueError:
+            raise ValueError(f"Unrecognized date format: {val}") from None
+        # Make parsed datetime timezone-aware in UTC
+        if dt.tzinfo is None:
+            return dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    if isinstance(val, datetime):
+        # Ensure tz-aware UTC
+        if val.tzinfo is None:
+            return val.replace(tzinfo=timezone.utc)
+        return val.astimezone(timezone.utc)
+    raise ValueError("start_date/end_date must be datetime, str, or None")
+
+
+def new_telegram_limiter() -> AdaptiveRateLimiter:
+    """
+    Creates a rate limiter with the default request rate for Telegram API calls.
+
+    Returns:
+        AdaptiveRateLimiter: A limiter to be shared by all chats scraped with the same client.
+    """
+    return AdaptiveRateLimiter(max_rate=_TELEGRAM_RATE)
+
+
+def new_translation_limiter() -> AdaptiveRateLimiter:
+    """
+    Creates a rate limiter with the default request rate for the translation service.
+
+    Returns:
+        AdaptiveRateLimiter: A limiter to be shared by all chats that are translated concurrently.
+    """
+    return AdaptiveRateLimiter(max_rate=_TRANSLATE_RATE)
+
+
+async def connect_client(session_path: str, api_id: int, api_hash: str, phone_number: str) -> TelegramClient:
+    """
+    Creates a Telegram client, connects it and authorizes the user if the session is not authorized yet.
+
+    One client is meant to be shared by all chats of a run, so the connection handshake and the
+    authorization happen only once.
+
+    Args:
+        session_path: Path of the Telethon session file.
         api_id: API ID for the Telegram client to connect to the Telegram server.
         api_hash: API hash for the Telegram client to authenticate requests.
         phone_number: Phone number linked to the Telegram account being used.
-        translation_option: Configuration for message text translation. Contains options for enabling translation,
-            source language, and target language.
-        cwd_new: Current working directory or path to save related files such as session, extracted media, etc.
 
     Returns:
-        tuple[list[list[Any]], bool]: A tuple containing a list of message metadata and a boolean `empty`,
-            where the list includes details such as sender, message ID, date, text, translation, and file path
-            for any downloaded media, and `empty` indicates whether any messages were found.
+        TelegramClient: The connected and authorized client. The caller is responsible for disconnecting it.
     """
+    client = TelegramClient(session_path, api_id, api_hash)
+    await client.connect()
 
-    # List to collect message data
-    data = []
-
-    async def _get_messages():
-        # Initialize Telegram client session for this chat
-        client = TelegramClient(
-            f"{cwd_new}/{chat_name}.session", api_id, api_hash
-        )
-        await client.connect()
-
+    try:
         # Authorize user if not already authorized
         if not await client.is_user_authorized():
             await client.send_code_request(phone_number)
             await client.sign_in(phone_number, input('Enter the verification code sent by Telegram: '))
+    except BaseException:
+        # Still flush and close the session if the sign-in fails or is interrupted
+        await client.disconnect()
+        raise
+    return client
 
-        # Get the entity (chat/channel/group) by chat_id
-        chat_entity = await client.get_entity(chat_id)
-
-        # Prepare date range for message extraction
-        today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-
-        # Normalize input dates
-        def _to_dt(val, default):
-            if val is None:
-                return default
-            if isinstance(val, str):
-                v = val.strip()
-                if v == "":
-                    return default
-                # Try several common formats
-                fmts = [
-                    "%Y-%m-%d",
-                    "%Y-%m-%d %H:%M",
-                    "%Y-%m-%d %H:%M:%S",
-                    "%d.%m.%Y",
-                    "%d.%m.%Y %H:%M",
-                    "%d.%m.%Y %H:%M:%S",
-                ]
-                for f in fmts:
-                    try:
-                        # Make parsed datetime timezone-aware in UTC
-                        return datetime.strptime(v, f).replace(tzinfo=timezone.utc)
-                    except Exception:
-                        pass
-                # Fallback: try fromisoformat
-                try:
-                    dt = datetime.fromisoformat(v)
-                    if dt.tzinfo is None:
-                        return dt.replace(tzinfo=timezone.utc)
-                    return dt.astimezone(timezone.utc)
-                except Exception:
-                    raise ValueError(f"Unrecognized date format: {val}")
-            if isinstance(val, datetime):
-                # Ensure tz-aware UTC
-                if val.tzinfo is None:
-                    return val.replace(tzinfo=timezone.utc)
-                return val.astimezone(timezone.utc)
-            raise ValueError("start_date/end_date must be datetime, str, or None")
-
-        start_dt = _to_dt(start_date, today_start)
-        end_dt = _to_dt(end_date, datetime.now(timezone.utc))
-
-        # Ensure chronological order
-        if end_dt < start_dt:
-            start_dt, end_dt = end_dt, start_dt
-
-        # Iterate through messages in chronological order starting from start_dt (lower bound)
-        async for message in client.iter_messages(chat_entity, offset_date=start_dt, reverse=True):
-            # Stop if we moved past the end_dt (messages are increasing in time with reverse=True)
-            if message.date > end_dt:
-                break
-            # Skip anything before the start_dt (shouldn't normally occur due to offset_date)
-            if message.date < start_dt:
-                continue
 
-            print(f"Extracted Message ID = {message.id} ; Date = {message.date}")
+async def scraping(client: TelegramClient, start_dt: datetime, end_dt: datetime, chat_id: Union[str, int], chat_name: str, translation_option: dict[str, Any], cwd_new: str, tg_limiter: Optional[AdaptiveRateLimiter] = None, min_id: int = 0, translate_limiter: Optional[AdaptiveRateLimiter] = None) -> tuple[str, Optional[tuple[datetime, datetime]], int]:
+    """
+    Extracts and processes messages from a Telegram group or channel for a specified time frame.
 
-            # Get sender information
-            sender = await client.get_entity(PeerUser(message.sender_id))
+    This function uses an already connected and authorized Telegram client, shared across all
+    chats, to read a specified Telegram group or channel. It extracts messages from the group/channel
+    within a user-specified time frame between start_dt and end_dt. Messages can include text, sender information,
+    media (photos or videos), and translation to English if enabled. The extracted rows are streamed
+    page by page to a JSON Lines spool file, so memory use stays bounded by the page size.
 
-            # Download media if present in the message
-            if message.photo:
-                # Save photo as 'photo_<message.id>.jpg'
-                media_path = await client.download_media(
-                    message.media,
-                    file=f"{cwd_new}/{chat_name}_photo_{message.id}.jpg"
-                )
-            elif (
-                    hasattr(message, 'media') and
-                    hasattr(message.media, 'document') and
-                    hasattr(message.media.document, 'mime_type') and
-                    message.media.document.mime_type == 'video/mp4'
-            ):
-                # Save video as 'video_<message.id>.mp4'
-                media_path = await client.download_media(
-                    message.media,
-                    file=f"{cwd_new}/{chat_name}_video_{message.id}.mp4"
-                )
-            else:
-                media_path = ''
+    Args:
+        client: Connected and authorized Telegram client (see `connect_client`).
+        start_dt: Inclusive start of the extraction as timezone-aware UTC datetime (see `to_utc_datetime`).
+        end_dt: Inclusive end of the extraction as timezone-aware UTC datetime, not before start_dt.
+        chat_id: Unique identifier or username of the chat/group/channel to extract messages from.
+        chat_name: Name of the chat used for naming the stored extracted data.
+        translation_option: Configuration for message text translation. Contains options for enabling translation,
+            source language, and target language.
+        cwd_new: Current working directory or path to save related files such as extracted media, etc.
+        tg_limiter: Rate limiter for Telegram API calls. Pass the same limiter for all chats scraped concurrently
+            with one client, so they share the account's request budget. If None, a new limiter is created.
+        min_id: ID of the last message an earlier run already extracted. Only messages after it are fetched,
+            so an incremental run does not page through the history again. 0 fetches from start_dt on.
+        translate_limiter: Rate limiter for the translation service. Pass the same limiter for all chats scraped
+            concurrently, so together they stay below the service's rate limit. If None, a new limiter is created.
 
-            # Translate message text to English using Google Translator (optional, safe)
-            translated_text = ''
-            if translation_option.get('translate'):
-                # If message is empty, set a placeholder to avoid translation errors
-                text_to_translate = message.text or ''
-                try:
-                    from deep_translator import GoogleTranslator  # lazy import
-                    translated_text = GoogleTranslator(
-                        source=translation_option.get('source_language', 'auto'),
-                        target=translation_option.get('target_language', 'en')
-                    ).translate(text_to_translate)
-                except Exception:
-                    # Fallback: skip translation silently if library or network not available
-                    translated_text = ''
+    Returns:
+        tuple[str, Optional[tuple[datetime, datetime]], int]: A tuple containing the path of the spool file, the
+            dates of the oldest and youngest extracted message, and the ID of the last message up to end_dt
+            (0 if there is none). Each line of the spool file is a JSON array with the sender name, sender ID,
+            message ID, date, text, translation, and file path for any downloaded media, in chronological order.
+            The date range is None if no messages were found.
+    """
+
+    # Rows are streamed to this JSON Lines file (one JSON array per message) instead of being kept in memory
+    spool_path = os.path.join(cwd_new, f'{chat_name}.jsonl')
+
+    # Get the entity (chat/channel/group) by chat_id
+    chat_entity = await client.get_entity(chat_id)
+
+    # Rate limiters for the Telegram API and the translation service
+    if tg_limiter is None:
+        tg_limiter = new_telegram_limiter()
+    if translate_limiter is None:
+        translate_limiter = new_translation_limiter()
+
+    # Create the translator once per chat (optional, safe). If source and target language are the same,
+    # every text is its own translation and no translator (and no HTTP request) is needed.
+    source_language = translation_option.get('source_language', 'auto')
+    target_language = translation_option.get('target_language', 'en')
+    copy_text = bool(translation_option.get('translate')) and source_language == target_language
+    translator = None
+    too_many_requests = ()
+    if translation_option.get('translate') and not copy_text:
+        try:
+            from deep_translator import GoogleTranslator  # lazy import
+            from deep_translator.exceptions import TooManyRequests
+            too_many_requests = TooManyRequests
+            translator = GoogleTranslator(source=source_language, target=target_language)
+        except Exception:
+            # Fallback: skip translation silently if the library is not available
+            translator = None
+
+    translator_lock = asyncio.Lock()
+
+    # Bounds the number of messages in flight at once
+    semaphore = asyncio.Semaphore(_CONCURRENCY)
+
+    # Sender lookups keyed by sender_id. The lookup task itself is cached, so concurrent
+    # messages from the same sender share a single get_entity request. The cache belongs to the
+    # client, so senders that post in several chats are resolved only once per run.
+    sender_cache = _sender_caches.setdefault(client, {})
 
-            # Append extracted information to the data list
-            data.append([
+    async def _get_sender(sender_id):
+        # Channel posts may have no sender
+        if sender_id is None:
+            return None
+        lookup = sender_cache.get(sender_id)
+        if lookup is None:
+            lookup = asyncio.ensure_future(_retry_on_flood(tg_limiter, chat_name, client.get_entity, PeerUser(sender_id)))
+            sender_cache[sender_id] = lookup
+            lookup.add_done_callback(lambda done: _forget_failed_lookup(sender_cache, sender_id, done))
+        # Shielded: a cancelled message must not cancel the lookup other messages are waiting for
+        return await asyncio.shield(lookup)
+
+    # Pool of reusable download buffers, one per message that can be in flight
+    buffer_pool: asyncio.Queue = asyncio.Queue(maxsize=_CONCURRENCY)
+    for _ in range(_CONCURRENCY):
+        buffer_pool.put_nowait(_PooledBuffer())
+
+    async def _download_media(message, path):
+        # Download into a pooled buffer, then write the file from a worker thread so that disk writes
+        # overlap with the network transfers of other messages instead of blocking the event loop
+        buffer = await buffer_pool.get()
+
+        async def _attempt():
+            # Every attempt starts with an empty buffer; a flood wait may interrupt a download halfway
+            buffer.reset()
+            return await client.download_media(message.media, file=buffer)
+
+        try:
+            result = await _retry_on_flood(tg_limiter, chat_name, _attempt)
+            if result is None:
+                return ''
+            with buffer.getbuffer() as view:
+                await asyncio.to_thread(_write_file, path, view)
+            return path
+        finally:
+            buffer_pool.put_nowait(buffer)
+
+    async def _download_range(document, mm, first_part, part_count):
+        # Stream `part_count` parts starting at part `first_part` straight into their place in the mapped file
+        position = first_part * _DOWNLOAD_PART_BYTES
+        async for chunk in client.iter_download(
+                document,
+                offset=position,
+                limit=part_count,
+                request_size=_DOWNLOAD_PART_BYTES,
+                file_size=document.size
+        ):
+            mm[position:position + len(chunk)] = chunk
+            position += len(chunk)
+
+    async def _download_document(document, path):
+        # Download a (video) document in parts of _DOWNLOAD_PART_BYTES. Large files are split into
+        # _DOWNLOAD_RANGES byte ranges that are fetched concurrently into a preallocated, memory-mapped file.
+        size = document.size
+        with open(path, 'wb') as f:
+            f.truncate(size)
+        if not size:
+            return path
+        parts = -(-size // _DOWNLOAD_PART_BYTES)
+        ranges = _DOWNLOAD_RANGES if size >= _PARALLEL_DOWNLOAD_MIN_BYTES else 1
+        parts_per_range = -(-parts // ranges)
+        with open(path, 'r+b') as f, mmap.mmap(f.fileno(), size) as mm:
+            # Wait for every range before unmapping, even if one of them fails
+            results = await asyncio.gather(
+                *(_retry_on_flood(tg_limiter, chat_name, _download_range, document, mm, first_part, min(parts_per_range, parts - first_part))
+                  for first_part in range(0, parts, parts_per_range)),
+                return_exceptions=True
+            )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return path
+
+    async def _get_media(message):
+        # Download media if present in the message (the document is only looked up for non-photos)
+        if message.photo is not None:
+            # Save photo as 'photo_<message.id>.jpg'
+            return await _download_media(message, f"{cwd_new}/{chat_name}_photo_{message.id}.jpg")
+        if getattr(document := getattr(message.media, 'document', None), 'mime_type', None) == _MP4:
+            # Save video as 'video_<message.id>.mp4'
+            return await _download_document(document, f"{cwd_new}/{chat_name}_video_{message.id}.mp4")
+        return ''
+
+    async def _process_message(message):
+        async with semaphore:
+            log.debug('Extracted Message ID = %s ; Date = %s', message.id, message.date)
+
+            # The sender lookup and the media download are independent requests, so run them concurrently:
+            # a message then takes as long as the slower of the two instead of their sum
+            sender, media_path = await asyncio.gather(_get_sender(message.sender_id), _get_media(message))
+
+            # Rows are immutable tuples (smaller than lists); the translation is filled in per page
+            return (
                 getattr(sender, 'title', getattr(sender, 'username', 'Unknown')),
                 message.sender_id,
                 message.id,
-                message.date,
+                # Converted once here, in the established 'YYYY-MM-DD HH:MM:SS+00:00' form of the exports
+                str(message.date),
                 message.text,
-                translated_text,
+                '',
                 media_path
-            ])
+            )
+
+    async def _translate_page(rows):
+        # Translate the distinct texts of a page and return the rows with the translations filled in. Messages
+        # without text (or only whitespace) are never sent, and texts seen before (forwards, reposts) are
+        # answered from the translation cache.
+        if copy_text:
+            return [row[:5] + (row[4],) + row[6:] if row[4] else row for row in rows]
+        if translator is None:
+            return rows
+        translations = {}
+        for row in rows:
+            text = row[4]
+            if text and text not in translations and not text.isspace():
+                translations[text] = _translation_cache.get(_translation_key(source_language, target_language, text))
+        # Each distinct uncached text is sent once, even if it occurs several times in the page
+        missing = [text for text, translated_text in translations.items() if translated_text is None]
+
+        for text in missing:
+            for _ in range(_TRANSLATE_RETRIES):
+                try:
+                    # Every request takes its own limiter token. GoogleTranslator keeps per-request state on the
+                    # instance, so only one request may use it at a time.
+                    async with translator_lock, translate_limiter:
+                        # The translator is blocking (HTTP), so run it off the event loop
+                        translated_text = await asyncio.to_thread(translator.translate, text)
+                except too_many_requests:
+                    # Rate limited: pause and send this text again
+                    translate_limiter.on_flood_wait(_TRANSLATE_BACKOFF_SECONDS)
+                    continue
+                except Exception:
+                    # Fallback: keep this translation empty (e.g. invalid text or network not available)
+                    break
+                translate_limiter.on_success()
+                translations[text] = translated_text
+                if translated_text is not None:
+                    _translation_cache.put(_translation_key(source_language, target_language, text), translated_text)
+                break
+        # Texts still rate limited after all attempts keep an empty translation
+        return [
+            row[:5] + (translations[row[4]],) + row[6:] if translations.get(row[4]) is not None else row
+            for row in rows
+        ]
+
+    async def _process_page(page):
+        # Process all messages of a page concurrently; gather keeps the page order
+        tasks = [asyncio.ensure_future(_process_message(message)) for message in page]
+        try:
+            rows = await asyncio.gather(*tasks)
+        except BaseException:
+            # gather does not stop the other messages when one fails (or the page is cancelled); stop them here
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return await _translate_page(rows)
+
+    # The newest message before end_dt is the last message to extract; its ID bounds every page
+    # request server-side (max_id is exclusive). The lower bound is pushed to the server as well:
+    # the first page starts at offset_date=start_dt, all following pages continue after the last ID.
+    # offset_date is exclusive and Telegram dates have second resolution, so shift both bounds by one second
+    # to keep start_dt and end_dt inclusive.
+    before_end = await _retry_on_flood(tg_limiter, chat_name, client.get_messages, chat_entity, limit=1, offset_date=end_dt + _ONE_SECOND)
+    # Without any message before end_dt there is nothing to fetch (max_id=1 stops the loop immediately)
+    max_id = before_end[0].id + 1 if before_end else 1
+
+    # Fetch the history in pages of _PAGE_SIZE messages in chronological order until the server
+    # returns an empty page. Each page is a single MTProto request. While a page is processed as a
+    # task, the next page is already fetched and started, so downloads and translations of one page
+    # overlap with the next; the semaphore still bounds the messages in flight.
+    count = 0
+    offset_id = 0
+    # Page tasks that were started but not written yet (at most two: the current page and the one before)
+    in_flight = []
+    if min_id:
+        # Messages up to min_id were extracted by an earlier run: continue right after them (by ID, without
+        # offset_date), unless start_dt lies after min_id, then after the last message before start_dt
+        before_start = await _retry_on_flood(tg_limiter, chat_name, client.get_messages, chat_entity, limit=1, offset_date=start_dt)
+        offset_id = max(min_id, before_start[0].id if before_start else 0)
+    # Rows arrive in chronological order, so the first and last written row bound the date range
+    first_date = last_date = None
+
+    def _write_page(rows, last_message):
+        nonlocal first_date, last_date
+        if rows:
+            first_date = first_date or rows[0][3]
+            last_date = rows[-1][3]
+        # Flush the finished rows to the spool file in page order so at most two pages are held in memory
+        spool.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+        # One progress line per _PROGRESS_INTERVAL messages instead of one per message
+        if (count + len(rows)) // _PROGRESS_INTERVAL > count // _PROGRESS_INTERVAL:
+            log.info('%s: extracted %d messages (latest ID = %s ; Date = %s)', chat_name, count + len(rows), last_message.id, last_message.date)
+        return len(rows)
+
+    with open(spool_path, 'w', encoding='utf-8', buffering=_SPOOL_BUFFER_BYTES) as spool:
+        try:
+            while max_id - offset_id > 1:
+                page = await _retry_on_flood(
+                    tg_limiter,
+                    chat_name,
+                    client.get_messages,
+                    chat_entity,
+                    limit=_PAGE_SIZE,
+                    offset_date=None if offset_id else start_dt - _ONE_SECOND,
+                    offset_id=offset_id,
+                    max_id=max_id,
+                    reverse=True
+                )
+                if not page:
+                    break
+                # Track the new task before awaiting the previous one, so it is cancelled as well if that fails
+                in_flight.append((asyncio.create_task(_process_page(page)), page[-1]))
+                offset_id = page[-1].id
+                if len(in_flight) > 1:
+                    task, last_message = in_flight[0]
+                    count += _write_page(await task, last_message)
+                    del in_flight[0]
+            while in_flight:
+                task, last_message = in_flight[0]
+                count += _write_page(await task, last_message)
+                del in_flight[0]
+        finally:
+            # Do not leave running page tasks behind if fetching or processing failed: cancel them and wait until
+            # they stopped, so no download keeps using the client after scraping() raised
+            unfinished = [task for task, _ in in_flight if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
 
-    # Run the asynchronous message extraction
-    asyncio.run(_get_messages())
+    log.info('%s: extraction finished, %d messages in total', chat_name, count)
 
     # Check if any messages were found in the selected time frame
-    if not data:
-        print('NO MESSAGES FOUND')
-        empty = True
-    else:
-        empty = False
+    if not count:
+        print(f'{chat_name}: NO MESSAGES FOUND')
+        return spool_path, None, max_id - 1
 
-    return data, empty
+    return spool_path, (datetime.fromisoformat(first_date), datetime.fromisoformat(last_date)), max_id - 1
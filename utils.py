@@ -10,37 +10,79 @@
 # ======================================
 
 # --- Standard library imports ---
+import asyncio
+import atexit
+import csv
+import heapq
+import json
+import operator
 import os
 import pathlib
-from datetime import datetime
-from typing import Union, Dict, Any, Sequence
-import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional, Union, Dict, Any, Sequence, Iterable, Iterator, BinaryIO
 
 # --- Third-party imports ---
-import pandas as pd
+from telethon import TelegramClient
+
+# --- Optional third-party imports ---
+# ijson parses existing JSON exports incrementally; fall back to loading them at once if it is not installed
+try:
+    import ijson
+except ImportError:
+    ijson = None
+# orjson serializes the JSON export much faster; fall back to the standard library if it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Local module imports ---
-from scraping import scraping
+from ratelimit import AdaptiveRateLimiter
+from scraping import scraping, to_utc_datetime
+
+# Column names of the CSV export (and keys of the JSON export), in row order
+_CSV_COLUMNS = ('SENDER_NAME', 'SENDER_ID', 'MESSAGE_ID', 'DATE', 'MESSAGE', 'TRANSLATED_MESSAGE', 'MEDIA_PATH')
+
+# Buffer size for export files. json.dump and csv.writer issue many small writes; a 1 MiB buffer
+# coalesces them into few large syscalls, which matters most on network or cloud-mounted volumes.
+# Larger buffers (e.g. 8 MiB) only pay off for bulk writes and cost memory per open file.
+_WRITE_BUFFER_BYTES = 1 << 20
 
+# Values of a JSON export object in `_CSV_COLUMNS` order, as a row tuple
+_row_from_item = operator.itemgetter(*_CSV_COLUMNS)
 
-def start(start_date: Union[str, datetime, None], end_date: Union[str, datetime, None], chat_id: Union[str, int], chat_name: str, api_id: int, api_hash: str, phone_number: str,
-          translation_option: Dict[str, Any], export_option: Dict[str, Any], cwd: str) -> None:
+# Encoded '"KEY": ' prefixes of the JSON export objects, indented for objects inside the top-level list
+# (export option 'pretty') and compact
+_JSON_KEY_PREFIXES = tuple(f'    {json.dumps(key)}: '.encode('utf-8') for key in _CSV_COLUMNS)
+_JSON_COMPACT_KEY_PREFIXES = tuple(f'{json.dumps(key)}:'.encode('utf-8') for key in _CSV_COLUMNS)
+
+# Exports run on one dedicated writer thread: they never block the event loop, and they never
+# compete with each other for the disk. Pending exports are flushed before the interpreter exits.
+_writer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='exporter')
+atexit.register(_writer_pool.shutdown, wait=True)
+
+
+async def start(client: TelegramClient, start_date: Union[str, datetime, None], end_date: Union[str, datetime, None], chat_id: Union[str, int], chat_name: str,
+                translation_option: Dict[str, Any], export_option: Dict[str, Any], cwd: str,
+                tg_limiter: Optional[AdaptiveRateLimiter] = None, translate_limiter: Optional[AdaptiveRateLimiter] = None) -> None:
     """
     Starts the scraping process for Telegram data and exports the results based on the specified
     options. The function sets up the working directory, normalizes date formats, and dynamically
     evaluates configured export formats (CSV, JSON) to save the scraped data.
 
     Args:
+        client: The connected and authorized Telegram client shared by all chats of the run.
         start_date: The start date for the scraping period. Can be a string, datetime, or None.
         end_date: The end date for the scraping period. Can be a string, datetime, or None.
         chat_id: The unique identifier or username of the Telegram chat to scrape data from.
         chat_name: The name of the chat under which the data will be organized and stored.
-        api_id: The API ID for the Telegram client used during the scraping process.
-        api_hash: The API hash for the Telegram client used during the scraping process.
-        phone_number: The phone number linked to the Telegram account for authentication.
         translation_option: Configuration dictionary defining translation options for the scraped data.
         export_option: Configuration dictionary specifying the desired formats and settings for data export.
         cwd: The current working directory where the scraped data will be stored.
+        tg_limiter: Rate limiter for Telegram API calls, shared by all chats that are scraped concurrently.
+        translate_limiter: Rate limiter for the translation service, shared by all chats that are scraped concurrently.
 
     Returns:
         None
@@ -49,63 +91,202 @@ def start(start_date: Union[str, datetime, None], end_date: Union[str, datetime,
     # Store data inside project root under 'data/<chat_name>'
     cwd_new = os.path.join(str(cwd), 'data', str(chat_name))
     check_dir(cwd_new)
-    data, empty = scraping(start_date, end_date, chat_id, chat_name, api_id, api_hash, phone_number, translation_option, cwd_new)
-
-    # Build filename suffix based on end_date-start_date
-    def _norm_dt(val, default):
-        if val is None:
-            return default
-        if isinstance(val, str):
-            v = val.strip()
-            if v == "":
-                return default
-            fmts = [
-                "%Y-%m-%d",
-                "%Y-%m-%d %H:%M",
-                "%Y-%m-%d %H:%M:%S",
-                "%d.%m.%Y",
-                "%d.%m.%Y %H:%M",
-                "%d.%m.%Y %H:%M:%S",
-            ]
-            for f in fmts:
-                try:
-                    return datetime.strptime(v, f)
-                except Exception:
-                    pass
-            try:
-                return datetime.fromisoformat(v)
-            except Exception:
-                return default
-        if isinstance(val, datetime):
-            return val
-        return default
-
-    start_dt = _norm_dt(start_date, datetime.now().replace(hour=0, minute=0, second=0, microsecond=0))
-    end_dt = _norm_dt(end_date, datetime.now())
+
+    # Resolve the time frame once; it is used for the extraction, the cursor and the filename suffix, and both
+    # defaults derive from the same moment
+    now = datetime.now(timezone.utc)
+    start_dt = to_utc_datetime(start_date, now.replace(hour=0, minute=0, second=0, microsecond=0))
+    end_dt = to_utc_datetime(end_date, now)
     if end_dt < start_dt:
         start_dt, end_dt = end_dt, start_dt
 
-    def _fmt(dt):
-        # Always use date only for filename suffix as per requirement
-        return dt.strftime('%Y-%m-%d')
-
-    filename_suffix = f"{_fmt(start_dt)}_{_fmt(end_dt)}"
-
-    if 'csv' in export_option['format']:
-        export_csv(data, chat_name, empty, export_option, cwd_new, filename_suffix)
-    if 'json' in export_option['format']:
-        export_json(data, chat_name, empty, export_option, cwd_new, filename_suffix)
+    # The cursor records the time span the chat was extracted for without gaps, the ID of the last message in
+    # it, and the export files holding that span. It is only kept in append mode. Messages up to that ID need
+    # not be fetched again if the time frame starts within the span and the appends go to exactly those files.
+    formats = [fmt for fmt in ('csv', 'json') if fmt in export_option['format']]
+    append = bool(export_option.get('append'))
+    cursor_path = os.path.join(cwd_new, f'{chat_name}.cursor')
+    cursor = _read_cursor(cursor_path) if append else None
+    cursor_valid = cursor is not None and all(
+        _latest_export(cwd_new, chat_name, fmt) == os.path.join(cwd_new, cursor[3].get(fmt, '')) for fmt in formats)
+    min_id = cursor[2] if cursor_valid and cursor[0] <= start_dt <= cursor[1] else 0
+    spool_path, date_range, last_id = await scraping(client, start_dt, end_dt, chat_id, chat_name, translation_option,
+                                                     cwd_new, tg_limiter, min_id, translate_limiter)
+
+    # Always use date only for filename suffix as per requirement
+    filename_suffix = f'{start_dt:%Y-%m-%d}_{end_dt:%Y-%m-%d}'
+
+    def _export():
+        output_paths = {}
+        if 'csv' in formats:
+            output_paths['csv'] = export_csv(read_rows(spool_path), chat_name, date_range is None, export_option, cwd_new, filename_suffix, date_range)
+        if 'json' in formats:
+            output_paths['json'] = export_json(read_rows(spool_path), chat_name, date_range is None, export_option, cwd_new, filename_suffix, date_range)
+        # The spool file is only an intermediate; the exports hold the data now
+        os.remove(spool_path)
+        if not append or not last_id:
+            return
+        # Update the cursor only once the data is exported. Without new messages the exports were left as they
+        # are, so the latest files hold the span.
+        if date_range is None:
+            output_paths = {fmt: _latest_export(cwd_new, chat_name, fmt) for fmt in formats}
+            if not all(output_paths.values()):
+                return
+        if cursor_valid and start_dt <= cursor[1] and end_dt >= cursor[0]:
+            # This run continued or overlapped the cursor's span, so together they have no gap
+            span = (min(start_dt, cursor[0]), max(end_dt, cursor[1]), max(last_id, cursor[2]))
+        elif cursor_valid and cursor[1] > end_dt:
+            # The files still hold the cursor's span, which reaches further
+            span = cursor[:3]
+        else:
+            span = (start_dt, end_dt, last_id)
+        _write_cursor(cursor_path, *span, {fmt: os.path.basename(path) for fmt, path in output_paths.items()})
+
+    # Serialize on the writer thread, so the event loop keeps scraping the other chats meanwhile
+    await asyncio.get_running_loop().run_in_executor(_writer_pool, _export)
     print(f'>>> FINISHED SCRAPING FOR CHAT: {chat_name} <<<')
     return
 
 
+def resolve_session_path(cwd: str, chat_names: Iterable[str]) -> str:
+    """
+    Returns the path of the Telethon session file shared by all chats and kept between runs.
+
+    The session lives in the stable 'data' directory of the project, so the authorization, the update state
+    and the peer cache are reused by the next run. If it does not exist yet but an older version of the scraper
+    left a per-chat session ('data/<chat_name>/<chat_name>.session'), that session is copied over so the user
+    does not have to sign in again.
+
+    Args:
+        cwd: The project root directory.
+        chat_names: Names of the configured chats, used to look for per-chat sessions of older versions.
+
+    Returns:
+        str: Path of the shared session file.
+    """
+    data_dir = os.path.join(str(cwd), 'data')
+    check_dir(data_dir)
+    session_path = os.path.join(data_dir, 'telegram_scraper.session')
+    if not os.path.isfile(session_path):
+        for chat_name in chat_names:
+            legacy_path = os.path.join(data_dir, str(chat_name), f'{chat_name}.session')
+            if os.path.isfile(legacy_path):
+                shutil.copyfile(legacy_path, session_path)
+                break
+    return session_path
+
+
+def _read_cursor(cursor_path: str) -> Optional[tuple[datetime, datetime, int, Dict[str, str]]]:
+    """
+    Reads the extraction cursor of a chat.
+
+    Args:
+        cursor_path: Path of the '<chat_name>.cursor' file.
+
+    Returns:
+        Optional[tuple[datetime, datetime, int, Dict[str, str]]]: The start and end date of the extracted span,
+            the ID of its last message and the names of the export files holding it (keyed by format), or None
+            if there is no (readable) cursor.
+    """
+    try:
+        with open(cursor_path, 'r', encoding='utf-8') as f:
+            cursor = json.load(f)
+        return (datetime.fromisoformat(cursor['start']), datetime.fromisoformat(cursor['end']),
+                int(cursor['last_id']), dict(cursor['files']))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cursor(cursor_path: str, start_dt: datetime, end_dt: datetime, last_id: int, files: Dict[str, str]) -> None:
+    """
+    Writes the extraction cursor of a chat: all messages from `start_dt` to `end_dt` have been extracted into
+    the given export files, the last of them being `last_id`.
+
+    Args:
+        cursor_path: Path of the '<chat_name>.cursor' file.
+        start_dt: Start date of the extracted span.
+        end_dt: End date of the extracted span.
+        last_id: ID of the last extracted message of the span.
+        files: Names of the export files holding the span, keyed by format ('csv', 'json').
+
+    Returns:
+        None
+    """
+    with open(cursor_path, 'w', encoding='utf-8') as f:
+        json.dump({'start': start_dt.isoformat(), 'end': end_dt.isoformat(), 'last_id': last_id, 'files': files}, f)
+
+
+def _latest_export(cwd_new: str, chat_name: str, extension: str) -> Optional[str]:
+    """
+    Finds the most recent export file of a chat in the given format.
+
+    Args:
+        cwd_new: The directory of the chat's data.
+        chat_name: The chat name used in the export file names.
+        extension: The export format, 'csv' or 'json'.
+
+    Returns:
+        Optional[str]: Path of the latest export file, or None if there is none.
+    """
+    # One pass over the directory with plain prefix/suffix tests (no fnmatch, no sorted list). The names end in
+    # 'YYYY-MM-DD_YYYY-MM-DD', so the lexicographically largest one is the latest. Unlike a glob pattern, this
+    # also works for chat names containing '[', ']' or '?'.
+    prefix, suffix = f'{chat_name}_data_', f'.{extension}'
+    latest = None
+    with os.scandir(cwd_new) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith(prefix) and name.endswith(suffix) and (latest is None or name > latest):
+                latest = name
+    return os.path.join(cwd_new, latest) if latest is not None else None
+
+
+class SpoolRows:
+    """
+    The message rows written by `scraping` to its JSON Lines spool file.
+
+    Every iteration reads the file lazily from the start, so exporters can pass over the rows more than once
+    without holding them in memory.
+
+    Usage:
+        for row in SpoolRows(spool_path):
+            ...
+    """
+
+    def __init__(self, spool_path: str) -> None:
+        """
+        Args:
+            spool_path: Path of the spool file returned by `scraping`.
+        """
+        self.spool_path = spool_path
+
+    def __iter__(self) -> Iterator[list[Any]]:
+        with open(self.spool_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def read_rows(spool_path: str) -> SpoolRows:
+    """
+    Lazily reads the message rows written by `scraping` from its JSON Lines spool file.
+
+    Args:
+        spool_path: Path of the spool file returned by `scraping`.
+
+    Returns:
+        SpoolRows: Re-iterable rows, one per message ('SENDER_NAME', 'SENDER_ID', 'MESSAGE_ID', 'DATE', 'MESSAGE',
+            'TRANSLATED_MESSAGE', 'MEDIA_PATH'), in chronological order. DATE is an ISO-like string.
+    """
+    return SpoolRows(spool_path)
+
+
 def check_dir(cwd_new: Union[str, 'pathlib.Path']) -> None:
     """
     Checks and creates a directory if it does not exist.
 
-    This function checks whether a directory specified by the `cwd_new`
-    parameter exists. If the directory does not exist, it creates the
-    directory.
+    This function creates the directory specified by the `cwd_new`
+    parameter, including missing parents. An existing directory is
+    left as it is (a single race-free makedirs call).
 
     Args:
         cwd_new: A path to the directory to check or create. The path
@@ -114,19 +295,19 @@ def check_dir(cwd_new: Union[str, 'pathlib.Path']) -> None:
     Returns:
         None
     """
-    if not os.path.isdir(str(cwd_new)):
-        os.makedirs(str(cwd_new))
+    os.makedirs(cwd_new, exist_ok=True)
     return
 
 
-def export_csv(data: Sequence[Sequence[Any]], chat_name: str, empty: bool, export_option: Dict[str, Any], cwd_new: str, filename_suffix: str) -> None:
+def export_csv(data: Iterable[Sequence[Any]], chat_name: str, empty: bool, export_option: Dict[str, Any], cwd_new: str, filename_suffix: str,
+               date_range: Optional[tuple[datetime, datetime]] = None) -> Optional[str]:
     """
     Exports data to a CSV file. Handles appending data to an existing CSV file or creating a new one, based on the given 
     export options. If the `empty` flag is True, no action is taken.
 
     Args:
-        data: A list of dictionaries containing export data. Each dictionary represents a single
-            row of data with keys matching the default DataFrame column names ('SENDER_NAME', 'SENDER_ID', 'MESSAGE_ID', 
+        data: An iterable of rows containing export data (e.g. from `read_rows`). Each row holds the values
+            of the default DataFrame column names ('SENDER_NAME', 'SENDER_ID', 'MESSAGE_ID', 
             'DATE', 'MESSAGE', 'TRANSLATED_MESSAGE', 'MEDIA_PATH').
         chat_name: The chat name used for naming the output CSV file.
         empty: A flag to indicate whether the data is empty. If True, the function will return immediately without
@@ -136,81 +317,197 @@ def export_csv(data: Sequence[Sequence[Any]], chat_name: str, empty: bool, expor
         cwd_new: The working directory where the CSV file should be saved.
         filename_suffix: The suffix to add as part of the output file name if saving a new file. Ignored when
             appending to an existing file.
+        date_range: Dates of the oldest and youngest row in `data`, as returned by `scraping`. If given, the
+            dates of the new rows are not inspected again when computing the range of an appended file.
 
     Returns:
-        None
+        Optional[str]: Path of the written CSV file, or None if `empty` is True.
     """
     if empty:
-        return
-
-    # Define DataFrame columns for channel/chat exports
-    df_new = pd.DataFrame(data, columns=[
-        'SENDER_NAME',
-        'SENDER_ID',
-        'MESSAGE_ID',
-        'DATE',
-        'MESSAGE',
-        'TRANSLATED_MESSAGE',
-        'MEDIA_PATH'
-    ])
-
-    # Default: save new data unless appending to an existing dataset
-    df_to_save = df_new
+        return None
 
     output_path = os.path.join(cwd_new, f'{chat_name}_data_{filename_suffix}.csv')
 
-    if bool(export_option.get('append', False)):
-        # Find latest CSV file for this chat (if any)
-        import glob
-        pattern = os.path.join(cwd_new, f'{chat_name}_data_*.csv')
-        existing_files = sorted(glob.glob(pattern), reverse=True)
-
-        if existing_files:
-            # Read the most recent CSV file and append to it
-            latest_file = existing_files[0]
-            df_existing = pd.read_csv(latest_file, encoding='utf-8')
-            # Concatenate and drop duplicates by MESSAGE_ID
-            df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-            df_combined = df_combined.drop_duplicates(subset=['MESSAGE_ID'])
-            df_to_save = df_combined
-            # Compute oldest and youngest dates across combined data
-            try:
-                # Ensure DATE is datetime for min/max
-                date_series = pd.to_datetime(df_combined['DATE'], errors='coerce')
-                min_dt = date_series.min()
-                max_dt = date_series.max()
-                def _fmt_dt(dt):
-                    if pd.isna(dt):
-                        return None
-                    # Force date-only format in filenames
-                    py_dt = dt.to_pydatetime() if hasattr(dt, 'to_pydatetime') else dt
-                    return py_dt.strftime('%Y-%m-%d')
-                min_str = _fmt_dt(min_dt) or 'unknown'
-                max_str = _fmt_dt(max_dt) or 'unknown'
-                # Build new target filename reflecting full range
-                new_output_path = os.path.join(cwd_new, f'{chat_name}_data_{min_str}_{max_str}.csv')
-                # If latest_file already has correct name, overwrite it; otherwise rename
-                if os.path.abspath(latest_file) != os.path.abspath(new_output_path):
-                    try:
-                        os.replace(latest_file, new_output_path)
-                        latest_file = new_output_path
-                    except Exception:
-                        # If rename fails, fall back to writing to new filename
-                        latest_file = new_output_path
-                output_path = latest_file
-            except Exception:
-                # Fallback: keep original latest_file name if any error
-                output_path = latest_file
-            print(f'Appending new chat content and updating file: {output_path}')
-        # else: no existing file -> keep df_to_save = df_new and use suffix path
-
-    # Save the updated/new file
-    df_to_save.to_csv(output_path, encoding='utf-8', index=False)
+    # Find latest CSV file for this chat (if any) to append to
+    latest_file = _latest_export(cwd_new, chat_name, 'csv') if export_option.get('append') else None
+
+    if latest_file is None:
+        # Nothing to merge: stream the rows straight into the file, without building a DataFrame
+        with open(output_path, 'w', encoding='utf-8', newline='', buffering=_WRITE_BUFFER_BYTES) as f:
+            # Same line endings as pandas' to_csv wrote for older exports, so appended and fresh files look alike
+            writer = csv.writer(f, lineterminator=os.linesep)
+            writer.writerow(_CSV_COLUMNS)
+            writer.writerows(data)
+        print(f'EXTRACTION COMPLETED. Data saved in: {output_path}')
+        return output_path
+
+    # Appending: only the MESSAGE_ID and DATE columns of the existing file are read, and only novel rows are
+    # appended to it, so an incremental scrape costs O(new rows) writes instead of rewriting the whole history
+    existing_ids = set()
+    min_date, max_date = _date_range_days(date_range)
+    with open(latest_file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, _CSV_COLUMNS)
+        id_idx, date_idx = header.index('MESSAGE_ID'), header.index('DATE')
+        for record in reader:
+            existing_ids.add(record[id_idx])
+            min_date, max_date = _update_date_range(record[date_idx], min_date, max_date)
+
+    def _novel_rows():
+        nonlocal min_date, max_date
+        for row in data:
+            msg_id = str(row[2])  # MESSAGE_ID is at index 2
+            if msg_id in existing_ids:
+                continue
+            existing_ids.add(msg_id)
+            if date_range is None:
+                min_date, max_date = _update_date_range(str(row[3]), min_date, max_date)
+            yield row
+
+    # The filtered rows are fed to a single writerows call, nothing is collected in between
+    with open(latest_file, 'a', encoding='utf-8', newline='', buffering=_WRITE_BUFFER_BYTES) as f:
+        csv.writer(f, lineterminator=os.linesep).writerows(_novel_rows())
+
+    # Rename the file so its name reflects the oldest and youngest date of the combined data
+    output_path = os.path.join(cwd_new, f"{chat_name}_data_{min_date or 'unknown'}_{max_date or 'unknown'}.csv")
+    if os.path.abspath(latest_file) != os.path.abspath(output_path):
+        try:
+            os.replace(latest_file, output_path)
+        except OSError:
+            # Keep the original name if the rename fails
+            output_path = latest_file
+    print(f'Appending new chat content and updating file: {output_path}')
     print(f'EXTRACTION COMPLETED. Data saved in: {output_path}')
-    return
+    return output_path
 
 
-def export_json(data: Sequence[Sequence[Any]], chat_name: str, empty: bool, export_option: Dict[str, Any], cwd_new: str, filename_suffix: str) -> None:
+def _update_date_range(date: str, min_date: Optional[str], max_date: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    """
+    Widens a (min, max) date range by the calendar day of one exported DATE value.
+
+    DATE values are ISO-like UTC timestamps ('YYYY-MM-DD HH:MM:SS+00:00'), so their first ten characters are the
+    day and compare correctly as strings. Empty values are ignored.
+
+    Args:
+        date: The DATE value of one row.
+        min_date: The oldest day seen so far ('YYYY-MM-DD'), or None.
+        max_date: The youngest day seen so far ('YYYY-MM-DD'), or None.
+
+    Returns:
+        tuple[Optional[str], Optional[str]]: The updated (min_date, max_date).
+    """
+    day = date[:10]
+    if not day:
+        return min_date, max_date
+    if min_date is None or day < min_date:
+        min_date = day
+    if max_date is None or day > max_date:
+        max_date = day
+    return min_date, max_date
+
+
+def _date_range_days(date_range: Optional[tuple[datetime, datetime]]) -> tuple[Optional[str], Optional[str]]:
+    """
+    Converts a (min, max) datetime range as returned by `scraping` into the day strings used in filenames.
+
+    Args:
+        date_range: Dates of the oldest and youngest message, or None.
+
+    Returns:
+        tuple[Optional[str], Optional[str]]: The days as 'YYYY-MM-DD', or (None, None) if no range is given.
+    """
+    if date_range is None:
+        return None, None
+    return date_range[0].strftime('%Y-%m-%d'), date_range[1].strftime('%Y-%m-%d')
+
+
+def _date_sort_key(row: Sequence[Any]) -> tuple[bool, str]:
+    """
+    Sort key for chronological order of export rows.
+
+    DATE values are uniform ISO-like UTC strings, so they sort correctly as strings; rows without a date go last.
+
+    Args:
+        row: A row in `_CSV_COLUMNS` order.
+
+    Returns:
+        tuple[bool, str]: The sort key.
+    """
+    return not row[3], str(row[3] or '')
+
+
+def _iter_json_items(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the message objects of an existing JSON export one by one.
+
+    With ijson installed the file is parsed incrementally, so memory does not grow with the size of the
+    history; otherwise it is loaded at once with the standard library. An unreadable file yields nothing.
+
+    Args:
+        path: Path of the JSON export (a list of message objects).
+
+    Returns:
+        Iterator[Dict[str, Any]]: The message objects, in file order.
+    """
+    with open(path, 'rb') as f:
+        try:
+            if ijson is not None:
+                yield from ijson.items(f, 'item', use_float=True)
+            else:
+                yield from json.load(f)
+        except ValueError:
+            # Broken or empty file: treat it as having no messages (ijson errors derive from ValueError)
+            return
+
+
+def _dump_json_value(value: Any) -> bytes:
+    """
+    Serializes a single value of the JSON export to UTF-8 bytes (orjson if installed, else the standard library).
+
+    Args:
+        value: The value to serialize; values that are not JSON types (e.g. datetime) are converted with str().
+
+    Returns:
+        bytes: The JSON representation of the value.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=str)
+    return json.dumps(value, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def _write_json_rows(f: BinaryIO, rows: Iterable[Sequence[Any]], pretty: bool = False) -> None:
+    """
+    Writes rows as a JSON list of message objects, either compact or formatted like json.dump(indent=2).
+
+    The object keys are encoded once up front and every row is written straight from its values, so no
+    dict is built per row and the document is never held in memory as a whole.
+
+    Args:
+        f: A file opened in binary write mode.
+        rows: Rows in `_CSV_COLUMNS` order.
+        pretty: Indent the output by two spaces per level. Compact output is about a third smaller.
+
+    Returns:
+        None
+    """
+    if pretty:
+        prefixes, list_open, row_open, field_separator, row_close, row_separator, list_close = \
+            _JSON_KEY_PREFIXES, b'[\n', b'  {\n', b',\n', b'\n  }', b',\n', b'\n]'
+    else:
+        prefixes, list_open, row_open, field_separator, row_close, row_separator, list_close = \
+            _JSON_COMPACT_KEY_PREFIXES, b'[', b'{', b',', b'}', b',', b']'
+    separator = list_open
+    for row in rows:
+        f.write(separator)
+        f.write(row_open)
+        f.write(field_separator.join(prefix + _dump_json_value(value) for prefix, value in zip(prefixes, row)))
+        f.write(row_close)
+        separator = row_separator
+    f.write(b'[]' if separator is list_open else list_close)
+
+
+def export_json(data: Iterable[Sequence[Any]], chat_name: str, empty: bool, export_option: Dict[str, Any], cwd_new: str, filename_suffix: str,
+                date_range: Optional[tuple[datetime, datetime]] = None) -> Optional[str]:
     """
     Exports the provided chat data to a JSON file. If appending is specified in the 
     export option, it merges the new data with content from the latest JSON file based 
@@ -218,7 +515,7 @@ def export_json(data: Sequence[Sequence[Any]], chat_name: str, empty: bool, expo
     each message.
 
     Args:
-        data: Sequence of sequences containing chat data. Each row contains message 
+        data: Iterable of sequences containing chat data (e.g. from `read_rows`). Each row contains message 
             details such as sender name, sender ID, message ID, timestamp, message 
             content, translated message, and media path.
         chat_name: A string representing the name of the chat to which the
@@ -227,115 +524,77 @@ def export_json(data: Sequence[Sequence[Any]], chat_name: str, empty: bool, expo
             function terminates early without performing any operations.
         export_option: A dictionary specifying export options. Should include an 
             'append' key to indicate if the new data should be merged with the latest 
-            existing JSON file.
+            existing JSON file. The optional 'pretty' key indents the output for human
+            readers; by default it is written compactly.
         cwd_new: A string representing the directory path where the JSON file should 
             be saved.
         filename_suffix: A string suffix to differentiate the output file if appending 
             is not enabled.
+        date_range: Dates of the oldest and youngest row in `data`, as returned by `scraping`. If given,
+            the dates of the new rows are not inspected again when computing the range of the merged file.
 
     Raises:
         Exception: If there is an error while reading existing JSON files during the 
             append process.
 
     Returns:
-        None
+        Optional[str]: Path of the written JSON file, or None if `empty` is True.
     """
     if empty:
-        return
+        return None
 
-    # Build base map by MESSAGE_ID
-    new_data = {str(row[2]): row for row in data}  # MESSAGE_ID is at index 2
+    # The new rows are in chronological order. Rows read from the spool file can be streamed more than once;
+    # only a one-shot iterator has to be kept in memory for the passes below.
+    new_rows = list(data) if isinstance(data, Iterator) else data
+    min_date, max_date = _date_range_days(date_range)
+    if date_range is None:
+        for row in new_rows:
+            min_date, max_date = _update_date_range(str(row[3]), min_date, max_date)
 
-    latest_file = None
-    if export_option['append']:
-        # Find latest JSON file for this chat (if any)
-        import glob
-        pattern = os.path.join(cwd_new, f'{chat_name}_data_*.json')
-        existing_files = sorted(glob.glob(pattern), reverse=True)
+    # Find latest JSON file for this chat (if any)
+    latest_file = _latest_export(cwd_new, chat_name, 'json') if export_option['append'] else None
 
-        if existing_files:
-            latest_file = existing_files[0]
-            with open(latest_file, 'r', encoding='utf-8') as f:
-                try:
-                    existing_json = json.load(f)
-                except Exception:
-                    existing_json = []
-            for item in existing_json:
+    if latest_file is None:
+        final_rows = new_rows
+    else:
+        print(f'Appending new chat content and updating file: {latest_file}')
+        # Rows already scraped again keep their new version; duplicates in the old file are dropped
+        seen_ids = {str(row[2]) for row in new_rows}  # MESSAGE_ID is at index 2
+
+        def _existing_rows():
+            nonlocal min_date, max_date
+            for item in _iter_json_items(latest_file):
                 msg_id = str(item.get('MESSAGE_ID'))
-                if msg_id not in new_data:
-                    new_data[msg_id] = [
-                        item.get('SENDER_NAME'),
-                        item.get('SENDER_ID'),
-                        item.get('MESSAGE_ID'),
-                        item.get('DATE'),
-                        item.get('MESSAGE'),
-                        item.get('TRANSLATED_MESSAGE'),
-                        item.get('MEDIA_PATH')
-                    ]
-            print(f'Appending new chat content and updating file: {latest_file}')
-
-    # Convert dict to list for saving
-    final_data = [
-        {
-            'SENDER_NAME': row[0],
-            'SENDER_ID': row[1],
-            'MESSAGE_ID': row[2],
-            'DATE': str(row[3]),  # Convert datetime to string for the JSON format
-            'MESSAGE': row[4],
-            'TRANSLATED_MESSAGE': row[5],
-            'MEDIA_PATH': row[6]
-        }
-        for row in new_data.values()
-    ]
-
-    # Sort final_data chronologically (oldest to youngest) to match CSV behavior
-    try:
-        import pandas as _pd
-        _dates = _pd.to_datetime([item.get('DATE') for item in final_data], errors='coerce')
-        # Build sortable keys: use timestamp seconds for valid dates, else +inf to push NaT to the end
-        _keys = []
-        for d in _dates:
-            try:
-                if _pd.isna(d):
-                    _keys.append(float('inf'))
-                else:
-                    _keys.append(d.to_pydatetime().timestamp())
-            except Exception:
-                _keys.append(float('inf'))
-        final_data = [item for _, item in sorted(zip(_keys, final_data), key=lambda t: t[0])]
-    except Exception:
-        # If parsing fails, leave order as-is
-        pass
-
-    # Determine output path: overwrite latest existing when appending, otherwise use suffix
-    if export_option.get('append'):
-        # Compute min/max date across final_data and rename file accordingly
-        try:
-            import pandas as _pd
-            dates = _pd.to_datetime([item.get('DATE') for item in final_data], errors='coerce')
-            min_dt = dates.min()
-            max_dt = dates.max()
-            def _fmt_dt(dt):
-                if _pd.isna(dt):
-                    return None
-                py_dt = dt.to_pydatetime() if hasattr(dt, 'to_pydatetime') else dt
-                return py_dt.strftime('%Y-%m-%d')
-            min_str = _fmt_dt(min_dt) or 'unknown'
-            max_str = _fmt_dt(max_dt) or 'unknown'
-            candidate = os.path.join(cwd_new, f'{chat_name}_data_{min_str}_{max_str}.json')
-            # If we had an existing latest file, and its path differs, rename it; otherwise just use candidate path
-            if latest_file and os.path.abspath(latest_file) != os.path.abspath(candidate):
+                if msg_id in seen_ids:
+                    continue
+                seen_ids.add(msg_id)
                 try:
-                    os.replace(latest_file, candidate)
-                    latest_file = candidate
-                except Exception:
-                    latest_file = candidate
-            output_path = latest_file or candidate
-        except Exception:
-            output_path = latest_file or os.path.join(cwd_new, f'{chat_name}_data_{filename_suffix}.json')
+                    # Carried-over items are turned into rows by one C-level lookup of all keys
+                    row = _row_from_item(item)
+                except KeyError:
+                    # Item written by another tool with missing keys
+                    row = tuple(item.get(key) for key in _CSV_COLUMNS)
+                min_date, max_date = _update_date_range(str(row[3] or ''), min_date, max_date)
+                yield row
+
+        # Both the new rows and the existing export are chronological already, so a linear merge of the two
+        # streams keeps the output sorted (oldest to youngest, to match CSV behavior) without sorting it again
+        final_rows = heapq.merge(new_rows, _existing_rows(), key=_date_sort_key)
+
+    # Write to a temporary file first: the existing export is still being read while the merged one is written,
+    # and its final name (the date range of the combined data) is only known afterwards
+    part_path = os.path.join(cwd_new, f'{chat_name}_data.json.part')
+    with open(part_path, 'wb', buffering=_WRITE_BUFFER_BYTES) as f:
+        _write_json_rows(f, final_rows, bool(export_option.get('pretty', False)))
+
+    # Determine output path: named after the date range of the combined data when appending, otherwise use suffix
+    if export_option.get('append'):
+        output_path = os.path.join(cwd_new, f"{chat_name}_data_{min_date or 'unknown'}_{max_date or 'unknown'}.json")
     else:
         output_path = os.path.join(cwd_new, f'{chat_name}_data_{filename_suffix}.json')
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(final_data, f, ensure_ascii=False, indent=2)
+    os.replace(part_path, output_path)
+    # The merged file supersedes the existing export
+    if latest_file and os.path.abspath(latest_file) != os.path.abspath(output_path):
+        os.remove(latest_file)
     print(f'EXTRACTION COMPLETED. Data saved in: {output_path}')
-    return
\ No newline at end of file
+    return output_path
\ No newline at end of file